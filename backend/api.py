@@ -4,115 +4,39 @@ Learning Journal - Flask API Server
 Provides REST API endpoints for journal entry management
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import json
+from flask import jsonify
 import os
-from datetime import datetime
+import sys
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend requests
+if not __package__:
+    # Run as a script (cd backend && python3 api.py): make the project root
+    # importable so backend.core is the same module flask_app.py uses
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-JSON_FILE = 'reflections.json'
+from backend.core import build_app, get_store
 
-def load_entries():
-    """Load entries from JSON file"""
-    if os.path.exists(JSON_FILE):
-        try:
-            with open(JSON_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    return []
+# Path to JSON file (next to this script)
+JSON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reflections.json')
 
-def save_entries(entries):
-    """Save entries to JSON file"""
-    try:
-        with open(JSON_FILE, 'w', encoding='utf-8') as f:
-            json.dump(entries, f, indent=2, ensure_ascii=False)
-        return True
-    except Exception as e:
-        print(f"Error saving entries: {e}")
-        return False
-
-@app.route('/api/entries', methods=['GET'])
-def get_entries():
-    """Get all journal entries"""
-    entries = load_entries()
-    return jsonify(entries)
-
-@app.route('/api/save-entry', methods=['POST'])
-def save_entry():
-    """Save a new journal entry"""
-    try:
-        data = request.get_json()
-        
-        # Validate required fields
-        if not data.get('title') or not data.get('content'):
-            return jsonify({'error': 'Title and content are required'}), 400
-        
-        # Load existing entries
-        entries = load_entries()
-        
-        # Create new entry
-        timestamp = int(datetime.now().timestamp() * 1000)
-        new_entry = {
-            'id': str(timestamp),
-            'title': data['title'],
-            'content': data['content'],
-            'date': data.get('date', datetime.now().strftime('%Y-%m-%d')),
-            'timestamp': data.get('timestamp', timestamp),
-            'location': data.get('location', {
-                'city': 'Unknown',
-                'state': '',
-                'country': 'Unknown',
-                'lat': None,
-                'lon': None
-            })
-        }
-        
-        # Add to beginning of list
-        entries.insert(0, new_entry)
-        
-        # Save to file
-        if save_entries(entries):
-            return jsonify({
-                'success': True,
-                'entry': new_entry,
-                'message': 'Entry saved successfully'
-            })
-        else:
-            return jsonify({'error': 'Failed to save entry'}), 500
-            
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+# Also serves the reflection API (/api/reflections, ...) from build_app()
+app = build_app(JSON_FILE, '/api', import_name=__name__)
+store = get_store(JSON_FILE)
 
-@app.route('/api/entry/<entry_id>', methods=['DELETE'])
-def delete_entry(entry_id):
-    """Delete a journal entry by ID"""
-    try:
-        entries = load_entries()
-        filtered_entries = [e for e in entries if e['id'] != entry_id]
-        
-        if len(filtered_entries) == len(entries):
-            return jsonify({'error': 'Entry not found'}), 404
-        
-        if save_entries(filtered_entries):
-            return jsonify({
-                'success': True,
-                'message': 'Entry deleted successfully'
-            })
-        else:
-            return jsonify({'error': 'Failed to delete entry'}), 500
-            
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+# Original endpoints, served by the same views as the reflection API
+app.add_url_rule('/api/entries', 'get_entries',
+                 app.view_functions['get_reflections'], methods=['GET'])
+app.add_url_rule('/api/save-entry', 'save_entry',
+                 app.view_functions['add_reflection'], methods=['POST'])
+app.add_url_rule('/api/entry/<entry_id>', 'delete_entry',
+                 app.view_functions['delete_reflection'], methods=['DELETE'])
+app.add_url_rule('/api/export', 'export_entries',
+                 app.view_functions['export_reflections'], methods=['GET'])
 
 @app.route('/api/clear-all', methods=['DELETE'])
 def clear_all_entries():
     """Clear all journal entries"""
     try:
-        if save_entries([]):
+        if store.save_entries([]):
             return jsonify({
                 'success': True,
                 'message': 'All entries cleared successfully'
@@ -122,11 +46,6 @@ def clear_all_entries():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'message': 'API is running'})
-
 if __name__ == '__main__':
     print("=" * 60)
     print("Learning Journal API Server")
@@ -137,6 +56,8 @@ if __name__ == '__main__':
     print("  POST   /api/save-entry    - Save new entry")
     print("  DELETE /api/entry/<id>    - Delete entry")
     print("  DELETE /api/clear-all     - Clear all entries")
+    print("  GET    /api/export        - Export all entries")
+    print("  *      /api/reflections   - Reflection API (see /api/health)")
     print("  GET    /api/health        - Health check")
     print("=" * 60)
     app.run(debug=True, port=5000)
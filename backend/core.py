@@ -0,0 +1,538 @@
+"""
+Learning Journal - Shared Backend Core
+Entry storage, caching and API routes shared by flask_app.py and api.py
+"""
+
+from flask import Flask, Response, request, jsonify
+from flask_cors import CORS
+from flask.json.provider import DefaultJSONProvider
+import fcntl
+import orjson
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import MappingProxyType
+
+# Rewrite the JSON file and start a fresh log once the log grows past this size
+LOG_COMPACT_BYTES = 256 * 1024
+# Number of entries serialized per chunk of a streamed response
+STREAM_BATCH_SIZE = 100
+# Location stored when a new entry does not provide one (copy before use)
+DEFAULT_LOCATION = MappingProxyType({
+    'city': 'Unknown',
+    'state': '',
+    'country': 'Unknown',
+    'lat': None,
+    'lon': None
+})
+
+# Last id handed out by new_entry_id()
+_last_id = 0
+_id_lock = threading.Lock()
+
+# One EntryStore per JSON file, shared by every app in the process
+_stores = {}
+_stores_lock = threading.Lock()
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that parses requests and serializes responses with orjson"""
+
+    def dumps(self, obj, indent=None, sort_keys=False, default=None, **kwargs):
+        if kwargs:
+            raise TypeError(f"Unsupported dumps() arguments: {', '.join(kwargs)}")
+        option = 0
+        # orjson only supports two-space indentation
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            raise TypeError(f"Unsupported loads() arguments: {', '.join(kwargs)}")
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Same argument handling as jsonify(): one positional value, several
+        # positional values as a list, or keyword arguments as an object
+        if args and kwargs:
+            raise TypeError('jsonify() behavior undefined when passed both args and kwargs')
+        if len(args) == 1:
+            obj = args[0]
+        else:
+            obj = args or kwargs or None
+        return self._app.response_class(orjson.dumps(obj), mimetype=self.mimetype)
+
+def new_entry_id(timestamp):
+    """Return a unique id based on a millisecond timestamp
+
+    Entries created within the same millisecond get consecutive ids
+    instead of colliding.
+    """
+    global _last_id
+    with _id_lock:
+        _last_id = max(timestamp, _last_id + 1)
+        return str(_last_id)
+
+def _file_state(path):
+    """Return (mtime, size) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _text_field(entry, key):
+    """Return entry[key] if it is a string, else '' (fields may be null)"""
+    value = entry.get(key)
+    return value if isinstance(value, str) else ''
+
+def _apply_record(entries_by_id, record):
+    """Apply one logged addition, update or deletion to entries_by_id"""
+    entry_id = record.get('id')
+    if record.get('_deleted'):
+        entries_by_id.pop(entry_id, None)
+    elif entry_id in entries_by_id:
+        entries_by_id[entry_id] = record
+    else:
+        # New entries go to the beginning, newest first
+        entries_by_id[entry_id] = record
+        entries_by_id.move_to_end(entry_id, last=False)
+
+class EntryStore:
+    """Journal entries kept in a JSON file plus an append-only change log
+
+    The JSON file (e.g. reflections.json) holds a snapshot of all entries.
+    Additions, updates and deletions are appended to a JSON-Lines log next
+    to it (reflections.jsonl) and folded back into the snapshot once the
+    log grows past LOG_COMPACT_BYTES. Parsed entries are cached until
+    either file changes on disk.
+
+    The log, lock and temp files are runtime state and are not tracked in
+    git, so the committed reflections.json is only a seed snapshot.
+    """
+
+    def __init__(self, json_file):
+        base = os.path.splitext(json_file)[0]
+        self.json_file = json_file
+        # Append-only log of changes made since json_file was last rewritten
+        self.log_file = base + '.jsonl'
+        # Held exclusively by whichever worker process is writing
+        self.lock_file = base + '.lock'
+        # Parsed entries keyed by id (newest first), reused until the JSON
+        # file or the log changes, plus the search index built from them
+        self._cache = {'state': None, 'data': None, 'search': None}
+        # Serializes cache access and writes between request threads
+        self._cache_lock = threading.RLock()
+
+    def _storage_state(self):
+        """Return a key identifying the current JSON file and log contents"""
+        return (_file_state(self.json_file), _file_state(self.log_file))
+
+    def _read_snapshot(self):
+        """Read the full entry list from the JSON file"""
+        try:
+            with open(self.json_file, 'rb') as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return []
+
+    def _replay_log(self, entries_by_id):
+        """Apply logged additions, updates and deletions on top of entries_by_id"""
+        try:
+            f = open(self.log_file, 'rb')
+        except FileNotFoundError:
+            return entries_by_id
+        with f:
+            for line in f:
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # Skip a partially written trailing record
+                    continue
+                _apply_record(entries_by_id, record)
+        return entries_by_id
+
+    def load_entries_by_id(self):
+        """Load entries keyed by id (cached until the JSON file or log changes)
+
+        The returned OrderedDict is shared with the cache and must not be
+        modified by callers; use append_entry() and append_deletion() instead.
+        """
+        with self._cache_lock:
+            state = self._storage_state()
+            if self._cache['state'] != state:
+                entries = self._read_snapshot()
+                self._cache['data'] = self._replay_log(
+                    OrderedDict((e.get('id'), e) for e in entries))
+                self._cache['state'] = state
+                self._cache['search'] = None
+            return self._cache['data']
+
+    def load_entries(self):
+        """Load entries from the JSON file and log as a list, newest first"""
+        with self._cache_lock:
+            return list(self.load_entries_by_id().values())
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialize writers across threads and worker processes
+
+        Readers never take this lock: the JSON file is only ever replaced
+        atomically and log records are appended with a single write().
+        Each call opens its own descriptor, so flock also serializes threads
+        of the same process; _cache_lock is not held while waiting.
+        """
+        # Ensure the data directory exists
+        os.makedirs(os.path.dirname(os.path.abspath(self.json_file)), exist_ok=True)
+        fd = os.open(self.lock_file, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the descriptor releases the flock
+            os.close(fd)
+
+    def _write_snapshot(self, entries):
+        """Atomically replace the JSON file with entries and discard the log"""
+        # Serialize up front so the file is written with a single write(); the
+        # file is kept compact, the export endpoint gives an indented copy
+        data = orjson.dumps(entries)
+        tmp_file = self.json_file + '.tmp'
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_file, self.json_file)
+        try:
+            os.remove(self.log_file)
+        except FileNotFoundError:
+            pass
+        with self._cache_lock:
+            self._cache['state'] = self._storage_state()
+            self._cache['data'] = OrderedDict((e.get('id'), e) for e in entries)
+            self._cache['search'] = None
+
+    def save_entries(self, entries):
+        """Save entries to the JSON file, folding in and discarding the log"""
+        try:
+            with self._write_lock():
+                self._write_snapshot(entries)
+            return True
+        except Exception as e:
+            print(f"Error saving entries: {e}")
+            return False
+
+    def _append_record(self, record, new=False):
+        """Append one record to the log and apply it to the cached entries
+
+        Returns True on success, False if writing failed, and None if the
+        record updates an entry that no longer exists.
+        """
+        try:
+            with self._write_lock():
+                with self._cache_lock:
+                    # Pick up changes made by other workers before applying ours
+                    entries_by_id = self.load_entries_by_id()
+                    before = self._cache['state']
+                    # An update must not bring back an entry deleted since it was read
+                    if not new and not record.get('_deleted') and record['id'] not in entries_by_id:
+                        return None
+                    # Another worker may have issued the same id in the same millisecond
+                    while new and record['id'] in entries_by_id:
+                        record['id'] = new_entry_id(int(record['id']) + 1)
+                fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    os.write(fd, orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+                finally:
+                    os.close(fd)
+                state = self._storage_state()
+                with self._cache_lock:
+                    # A reader may already have reloaded the log with our record
+                    if self._cache['state'] == before:
+                        _apply_record(self._cache['data'], record)
+                        self._cache['search'] = None
+                        self._cache['state'] = state
+                    compact_entries = None
+                    if state[1] is not None and state[1][1] > LOG_COMPACT_BYTES:
+                        compact_entries = self.load_entries()
+                if compact_entries is not None:
+                    try:
+                        self._write_snapshot(compact_entries)
+                    except Exception as e:
+                        # The record is already in the log; compact next time
+                        print(f"Error compacting entries: {e}")
+            return True
+        except Exception as e:
+            print(f"Error saving entries: {e}")
+            return False
+
+    def append_entry(self, entry, new=False):
+        """Log an added (new=True) or updated entry without rewriting the JSON file
+
+        Returns None instead of logging an update whose entry is gone.
+        """
+        return self._append_record(entry, new)
+
+    def append_deletion(self, entry_id):
+        """Log the deletion of an entry without rewriting the JSON file"""
+        return self._append_record({'id': entry_id, '_deleted': True})
+
+    def etag(self):
+        """Return an ETag identifying the current version of the entries"""
+        with self._cache_lock:
+            self.load_entries_by_id()
+            return '-'.join(
+                str(part)
+                for file_state in self._cache['state']
+                for part in (file_state or (0, 0))
+            )
+
+    def load_search_index(self):
+        """Return the search rows as (entry, title, content) tuples, newest first
+
+        title and content are lowercased and encoded as UTF-8 bytes. They
+        are kept apart so a query cannot match across the two fields. Built
+        once per change to the entries, so searches do not lowercase every
+        entry on every request.
+        """
+        with self._cache_lock:
+            entries_by_id = self.load_entries_by_id()
+            if self._cache['search'] is None:
+                rows = [
+                    (e,
+                     _text_field(e, 'title').lower().encode('utf-8'),
+                     _text_field(e, 'content').lower().encode('utf-8'))
+                    for e in entries_by_id.values()
+                ]
+                self._cache['search'] = {'rows': rows, 'by_date': None}
+            return self._cache['search']['rows']
+
+    def load_date_index(self):
+        """Return (dates, positions) for filtering the search rows by date
+
+        dates holds every entry's date in ascending order (entries without a
+        string date sort as '') and positions[i] is the index in the search
+        rows of the entry dated dates[i]. Built on the first date-filtered
+        search after a change.
+        """
+        with self._cache_lock:
+            rows = self.load_search_index()
+            search = self._cache['search']
+            if search['by_date'] is None:
+                positions = sorted(range(len(rows)), key=lambda i: _text_field(rows[i][0], 'date'))
+                dates = [_text_field(rows[i][0], 'date') for i in positions]
+                search['by_date'] = (dates, positions)
+            return search['by_date']
+
+def get_store(json_file):
+    """Return the EntryStore for json_file, creating it on first use"""
+    key = os.path.abspath(json_file)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = EntryStore(json_file)
+        return _stores[key]
+
+def new_entry(data):
+    """Build a new entry from request data (title and content already validated)"""
+    timestamp = time.time_ns() // 1_000_000
+    return {
+        'id': new_entry_id(timestamp),
+        'title': data['title'],
+        'content': data['content'],
+        'date': data.get('date') or time.strftime('%Y-%m-%d'),
+        'timestamp': data.get('timestamp', timestamp),
+        'location': data['location'] if 'location' in data else dict(DEFAULT_LOCATION)
+    }
+
+def stream_entries(entries):
+    """Yield entries as a JSON array, a batch of entries at a time"""
+    yield b'['
+    for start in range(0, len(entries), STREAM_BATCH_SIZE):
+        chunk = b','.join(orjson.dumps(e) for e in entries[start:start + STREAM_BATCH_SIZE])
+        yield b',' + chunk if start else chunk
+    yield b']'
+
+def entries_response(store):
+    """Stream all entries as JSON with an ETag, or 304 if the client has them"""
+    # Tag before loading so a concurrent write can only make the tag stale
+    etag = store.etag()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(stream_entries(store.load_entries()), mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
+
+def export_response(store):
+    """Return all entries as JSON, indented when ?pretty=1"""
+    option = orjson.OPT_INDENT_2 if request.args.get('pretty') == '1' else 0
+    return Response(orjson.dumps(store.load_entries(), option=option),
+                    mimetype='application/json')
+
+def build_app(json_path, url_prefix='', import_name=__name__):
+    """Create a Flask app serving the reflection API for json_path
+
+    API routes are registered under url_prefix; pass import_name so Flask
+    finds the caller's templates and static files.
+    """
+    app = Flask(import_name)
+    app.json = OrjsonProvider(app)
+    CORS(app)  # Enable CORS for frontend requests
+
+    store = get_store(json_path)
+    app.extensions['entry_store'] = store
+
+    @app.route(f'{url_prefix}/reflections', methods=['GET'])
+    def get_reflections():
+        """Get all journal reflections"""
+        try:
+            return entries_response(store)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route(f'{url_prefix}/add_reflection', methods=['POST'])
+    def add_reflection():
+        """Add a new journal reflection"""
+        try:
+            data = request.get_json()
+
+            # Validate required fields
+            if not data.get('title') or not data.get('content'):
+                return jsonify({'error': 'Title and content are required'}), 400
+
+            # Create new entry
+            entry = new_entry(data)
+
+            # Save to file (new entries are kept at the beginning)
+            if store.append_entry(entry, new=True):
+                return jsonify({
+                    'success': True,
+                    'entry': entry,
+                    'message': 'Reflection added successfully'
+                })
+            else:
+                return jsonify({'error': 'Failed to save reflection'}), 500
+
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route(f'{url_prefix}/update_reflection/<entry_id>', methods=['PUT'])
+    def update_reflection(entry_id):
+        """Update an existing reflection"""
+        try:
+            data = request.get_json()
+
+            # Find entry by ID
+            entry = store.load_entries_by_id().get(entry_id)
+
+            if entry is None:
+                return jsonify({'error': 'Reflection not found'}), 404
+
+            # Update entry fields (cached entries are shared, so work on a copy)
+            updated_entry = entry.copy()
+            if 'title' in data:
+                updated_entry['title'] = data['title']
+            if 'content' in data:
+                updated_entry['content'] = data['content']
+            if 'date' in data:
+                updated_entry['date'] = data['date']
+            if 'location' in data:
+                updated_entry['location'] = data['location']
+
+            # Update timestamp to reflect modification time
+            updated_entry['timestamp'] = time.time_ns() // 1_000_000
+
+            # Save to file (None means the entry was deleted meanwhile)
+            saved = store.append_entry(updated_entry)
+            if saved is None:
+                return jsonify({'error': 'Reflection not found'}), 404
+            if saved:
+                return jsonify({
+                    'success': True,
+                    'entry': updated_entry,
+                    'message': 'Reflection updated successfully'
+                })
+            else:
+                return jsonify({'error': 'Failed to update reflection'}), 500
+
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route(f'{url_prefix}/delete_reflection/<entry_id>', methods=['DELETE'])
+    def delete_reflection(entry_id):
+        """Delete a reflection by ID"""
+        try:
+            if entry_id not in store.load_entries_by_id():
+                return jsonify({'error': 'Reflection not found'}), 404
+
+            if store.append_deletion(entry_id):
+                return jsonify({
+                    'success': True,
+                    'message': 'Reflection deleted successfully'
+                })
+            else:
+                return jsonify({'error': 'Failed to delete reflection'}), 500
+
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route(f'{url_prefix}/reflections/search', methods=['GET'])
+    def search_reflections():
+        """Search reflections on the server side"""
+        try:
+            query = request.args.get('q', '').lower().strip()
+            date_from = request.args.get('date_from', '')
+            date_to = request.args.get('date_to', '')
+
+            rows = store.load_search_index()
+
+            # Filter by date range (binary search over the sorted dates)
+            if date_from or date_to:
+                dates, positions = store.load_date_index()
+                lo = bisect_left(dates, date_from) if date_from else 0
+                hi = bisect_right(dates, date_to) if date_to else len(dates)
+                # Restore newest-first order for the matching rows
+                rows = [rows[i] for i in sorted(positions[lo:hi])]
+
+            # Filter by keyword (search in title and content)
+            if query:
+                query = query.encode('utf-8')
+                rows = [row for row in rows if query in row[1] or query in row[2]]
+
+            return jsonify([row[0] for row in rows])
+
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route(f'{url_prefix}/reflections/export', methods=['GET'])
+    def export_reflections():
+        """Export all reflections as JSON, indented when ?pretty=1"""
+        try:
+            return export_response(store)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route(f'{url_prefix}/health', methods=['GET'])
+    def health_check():
+        """Health check endpoint"""
+        return jsonify({
+            'status': 'healthy',
+            'message': 'Learning Journal API is running',
+            'endpoints': {
+                f'GET {url_prefix}/reflections': 'Get all reflections',
+                f'POST {url_prefix}/add_reflection': 'Add new reflection',
+                f'PUT {url_prefix}/update_reflection/<id>': 'Update reflection',
+                f'DELETE {url_prefix}/delete_reflection/<id>': 'Delete reflection',
+                f'GET {url_prefix}/reflections/search': 'Search reflections',
+                f'GET {url_prefix}/reflections/export': 'Export reflections (?pretty=1 to indent)'
+            }
+        })
+
+    return app
@@ -4,50 +4,30 @@ Learning Journal - Save Entry Script
 Allows manual entry creation via command line interface
 """
 
-import json
 import os
-from datetime import datetime
+import sys
+import time
 
-# Path to the JSON file
-JSON_FILE = 'reflections.json'
+if not __package__:
+    # Run as a script (cd backend && python3 save_entry.py): make the project
+    # root importable so entries go through the same store as the API
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def load_entries():
-    """Load existing entries from JSON file"""
-    if os.path.exists(JSON_FILE):
-        try:
-            with open(JSON_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            print("Warning: JSON file is corrupted. Creating new file.")
-            return []
-    return []
+from backend.core import DEFAULT_LOCATION, get_store, new_entry_id
 
-def save_entries(entries):
-    """Save entries to JSON file"""
-    try:
-        with open(JSON_FILE, 'w', encoding='utf-8') as f:
-            json.dump(entries, f, indent=2, ensure_ascii=False)
-        return True
-    except Exception as e:
-        print(f"Error saving entries: {e}")
-        return False
+# Path to the JSON file (next to this script)
+JSON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reflections.json')
 
 def create_entry(title, content):
     """Create a new journal entry"""
-    timestamp = int(datetime.now().timestamp() * 1000)
+    timestamp = time.time_ns() // 1_000_000
     entry = {
-        'id': str(timestamp),
+        'id': new_entry_id(timestamp),
         'title': title,
         'content': content,
-        'date': datetime.now().strftime('%Y-%m-%d'),
+        'date': time.strftime('%Y-%m-%d'),
         'timestamp': timestamp,
-        'location': {
-            'city': 'Unknown',
-            'state': '',
-            'country': 'Unknown',
-            'lat': None,
-            'lon': None
-        }
+        'location': dict(DEFAULT_LOCATION)
     }
     return entry
 
@@ -76,18 +56,17 @@ def main():
         print("Error: Content cannot be empty!")
         return
     
-    # Create and save entry
-    entries = load_entries()
+    # Create and save entry (logged under the same lock the API uses)
+    store = get_store(JSON_FILE)
     new_entry = create_entry(title, content)
-    entries.insert(0, new_entry)  # Add to beginning
     
-    if save_entries(entries):
+    if store.append_entry(new_entry, new=True):
         print("\n" + "=" * 60)
         print("✅ Entry saved successfully!")
         print("=" * 60)
         print(f"Title: {title}")
         print(f"Date: {new_entry['date']}")
-        print(f"Total entries: {len(entries)}")
+        print(f"Total entries: {len(store.load_entries())}")
     else:
         print("\n❌ Failed to save entry!")
 
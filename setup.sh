@@ -44,6 +44,9 @@ echo "   cd backend && python3 api.py"
 echo ""
 echo "3. Open journal.html in your browser"
 echo ""
+echo "4. Run the full app in production (from the project root):"
+echo "   gunicorn -w 4 -k gthread --threads 8 wsgi:application"
+echo ""
 echo "For API mode, edit js/storage.js and set:"
 echo "   USE_API: true"
 echo ""
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Learning Journal PWA - WSGI Entry Point
+Exposes the Flask app to production WSGI servers, e.g.:
+
+    gunicorn -w 4 -k gthread --threads 8 wsgi:application
+"""
+
+from flask_app import app as application
+
+if __name__ == '__main__':
+    application.run(port=5000)